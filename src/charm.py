@@ -4,10 +4,14 @@
 
 """Charmed operator for the 5G SMF service for K8s."""
 
+import hashlib
 import logging
+import re
+from functools import cached_property
 from ipaddress import IPv4Address
+from pathlib import Path
 from subprocess import check_output
-from typing import List, Optional, cast
+from typing import Dict, List, Optional, cast
 
 from charms.loki_k8s.v1.loki_push_api import LogForwarder
 from charms.prometheus_k8s.v0.prometheus_scrape import (
@@ -23,38 +27,76 @@ from charms.tls_certificates_interface.v4.tls_certificates import (
     PrivateKey,
     TLSCertificatesRequiresV4,
 )
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from ops import (
     ActiveStatus,
     BlockedStatus,
     CollectStatusEvent,
     ModelError,
     Port,
+    StatusBase,
     WaitingStatus,
     main,
 )
 from ops.charm import CharmBase
 from ops.framework import EventBase
-from ops.pebble import Layer
+from ops.pebble import APIError, FileInfo, Layer
 
 logger = logging.getLogger(__name__)
 
 BASE_CONFIG_PATH = "/etc/smf"
 CONFIG_FILE = "smfcfg.yaml"
+CONFIG_FILE_DIGEST = f"{CONFIG_FILE}.sha256"
 UEROUTING_CONFIG_FILE = "uerouting.yaml"
+CONFIG_FILE_PATH = f"{BASE_CONFIG_PATH}/{CONFIG_FILE}"
+CONFIG_FILE_DIGEST_PATH = f"{BASE_CONFIG_PATH}/{CONFIG_FILE_DIGEST}"
+UEROUTING_CONFIG_FILE_PATH = f"{BASE_CONFIG_PATH}/{UEROUTING_CONFIG_FILE}"
+STATIC_ENVIRONMENT_VARIABLES = {"PFCP_PORT_UPF": "8805", "MANAGED_BY_CONFIG_POD": "true"}
+SMF_COMMAND = f"/bin/smf -smfcfg {CONFIG_FILE_PATH} -uerouting {UEROUTING_CONFIG_FILE_PATH}"
 SMF_SBI_PORT = 29502
 PFCP_PORT = 8805
 PROMETHEUS_PORT = 9089
 CERTS_DIR_PATH = "/support/TLS"  # The certs directory is hardcoded in the SMF code.
 PRIVATE_KEY_NAME = "smf.key"
+PRIVATE_KEY_DIGEST_NAME = f"{PRIVATE_KEY_NAME}.sha256"
 CERTIFICATE_NAME = "smf.pem"
+CERTIFICATE_DIGEST_NAME = f"{CERTIFICATE_NAME}.sha256"
+PRIVATE_KEY_PATH = f"{CERTS_DIR_PATH}/{PRIVATE_KEY_NAME}"
+PRIVATE_KEY_DIGEST_PATH = f"{CERTS_DIR_PATH}/{PRIVATE_KEY_DIGEST_NAME}"
+CERTIFICATE_PATH = f"{CERTS_DIR_PATH}/{CERTIFICATE_NAME}"
+CERTIFICATE_DIGEST_PATH = f"{CERTS_DIR_PATH}/{CERTIFICATE_DIGEST_NAME}"
 CERTIFICATE_COMMON_NAME = "smf.sdcore"
+CERTIFICATE_SANS_DNS = frozenset([CERTIFICATE_COMMON_NAME])
+CERTIFICATE_REQUEST = CertificateRequestAttributes(
+    common_name=CERTIFICATE_COMMON_NAME,
+    sans_dns=CERTIFICATE_SANS_DNS,
+)
 LOGGING_RELATION_NAME = "logging"
 FIVEG_NRF_RELATION_NAME = "fiveg_nrf"
 SDCORE_CONFIG_RELATION_NAME = "sdcore_config"
 TLS_RELATION_NAME = "certificates"
+REQUIRED_RELATIONS = (FIVEG_NRF_RELATION_NAME, TLS_RELATION_NAME, SDCORE_CONFIG_RELATION_NAME)
+FILE_READ_CHUNK_SIZE = 64 * 1024
 WORKLOAD_VERSION_FILE_NAME = "/etc/workload-version"
 
+# Matches only canonical dotted-quad addresses, the same ones IPv4Address accepts and
+# returns unchanged. Anything else goes through IPv4Address for its error handling.
+_IPV4_OCTET = r"(25[0-5]|2[0-4][0-9]|1[0-9]{2}|[1-9]?[0-9])"
+_IPV4_ADDRESS_PATTERN = re.compile(rf"^{_IPV4_OCTET}(\.{_IPV4_OCTET}){{3}}$")
+
+# Templates ship with the charm and never change at runtime, so the environment is shared
+# and the SMF config template is compiled once when the module is loaded. Every hook runs
+# in a new process, so the compiled bytecode is also cached on disk between hooks.
+_JINJA_ENV = Environment(
+    loader=FileSystemLoader(Path(__file__).parent / "templates"),
+    bytecode_cache=FileSystemBytecodeCache(pattern="sdcore-smf-%s.cache"),
+    auto_reload=False,
+)
+_SMF_CONFIG_TEMPLATE = _JINJA_ENV.get_template("smfcfg.yaml.j2")
+
+# The UE routing config ships with the charm, so it is read once when the module is loaded.
+_UEROUTING_CONFIG_CONTENT = (Path(__file__).parent / UEROUTING_CONFIG_FILE).read_text()
+
 
 class SMFOperatorCharm(CharmBase):
     """Main class to describe juju event handling for the SD-Core SMF operator for K8s."""
@@ -71,6 +113,9 @@ class SMFOperatorCharm(CharmBase):
             return
         self._container_name = self._service_name = "smf"
         self._container = self.unit.get_container(self._container_name)
+        self._workload_directories: Dict[str, Optional[Dict[str, FileInfo]]] = {}
+        self._workload_file_contents: Dict[str, str] = {}
+        self._container_is_reachable = False
         self._nrf_requires = NRFRequires(charm=self, relation_name=FIVEG_NRF_RELATION_NAME)
         self._webui_requires = SdcoreConfigRequires(
             charm=self, relation_name=SDCORE_CONFIG_RELATION_NAME
@@ -93,7 +138,7 @@ class SMFOperatorCharm(CharmBase):
         self._certificates = TLSCertificatesRequiresV4(
             charm=self,
             relationship_name=TLS_RELATION_NAME,
-            certificate_requests=[self._get_certificate_request()],
+            certificate_requests=[CERTIFICATE_REQUEST],
         )
         self.framework.observe(self.on.update_status, self._configure_sdcore_smf)
         self.framework.observe(self.on.smf_pebble_ready, self._configure_sdcore_smf)
@@ -130,11 +175,16 @@ class SMFOperatorCharm(CharmBase):
         if not self._ue_config_file_is_written():
             self._write_ue_config_file()
 
-        if not self._certificate_is_available():
+        provider_certificate, private_key = self._certificates.get_assigned_certificate(
+            certificate_request=CERTIFICATE_REQUEST
+        )
+        if not provider_certificate or not private_key:
             logger.info("The certificate is not available yet.")
             return
 
-        certificate_update_required = self._check_and_update_certificate()
+        certificate_update_required = self._check_and_update_certificate(
+            certificate=provider_certificate.certificate, private_key=private_key
+        )
 
         desired_config_file = self._generate_smf_config_file()
         if config_update_required := self._is_config_update_required(desired_config_file):
@@ -143,7 +193,7 @@ class SMFOperatorCharm(CharmBase):
         should_restart = config_update_required or certificate_update_required
         self._configure_pebble(restart=should_restart)
 
-    def _on_collect_unit_status(self, event: CollectStatusEvent):  # noqa C901
+    def _on_collect_unit_status(self, event: CollectStatusEvent):
         """Check the unit status and set to Unit when CollectStatusEvent is fired.
 
         Also sets the unit workload version if present
@@ -160,45 +210,16 @@ class SMFOperatorCharm(CharmBase):
             logger.info("Scaling is not implemented for this charm")
             return
 
-        if invalid_configs := self._get_invalid_configs():
-            event.add_status(
-                BlockedStatus(f"The following configurations are not valid: {invalid_configs}")
-            )
-            logger.info("The following configurations are not valid: %s", invalid_configs)
-            return
-
-        if missing_relations := self._missing_relations():
-            event.add_status(
-                BlockedStatus(f"Waiting for {', '.join(missing_relations)} relation(s)")
-            )
-            logger.info("Waiting for %s  relation(s)", ", ".join(missing_relations))
-            return
-
-        if not self._container.can_connect():
-            event.add_status(WaitingStatus("Waiting for container to be ready"))
-            logger.info("Waiting for container to be ready")
+        if setup_status := self._get_setup_status():
+            event.add_status(setup_status)
+            logger.info("%s", setup_status.message)
             return
 
         self.unit.set_workload_version(self._get_workload_version())
 
-        if not self._nrf_is_available():
-            event.add_status(WaitingStatus("Waiting for NRF relation to be available"))
-            logger.info("Waiting for NRF relation to be available")
-            return
-
-        if not self._webui_data_is_available:
-            event.add_status(WaitingStatus("Waiting for Webui data to be available"))
-            logger.info("Waiting for Webui data to be available")
-            return
-
-        if not self._storage_is_attached():
-            event.add_status(WaitingStatus("Waiting for storage to be attached"))
-            logger.info("Waiting for storage to be attached")
-            return
-
-        if not _get_pod_ip():
-            event.add_status(WaitingStatus("Waiting for pod IP address to be available"))
-            logger.info("Waiting for pod IP address to be available")
+        if data_status := self._data_status:
+            event.add_status(data_status)
+            logger.info("%s", data_status.message)
             return
 
         if not self._certificate_is_available():
@@ -218,7 +239,7 @@ class SMFOperatorCharm(CharmBase):
         Returns:
             bool: Whether the SMF service is running.
         """
-        if not self._container.can_connect():
+        if not self._can_connect_to_container():
             return False
         try:
             service = self._container.get_service(self._service_name)
@@ -232,61 +253,72 @@ class SMFOperatorCharm(CharmBase):
         Returns:
             ready_to_configure: True if all conditions are met else False
         """
-        if not self._container.can_connect():
-            return False
+        return self._get_setup_status() is None and self._data_status is None
 
-        if self._get_invalid_configs():
-            return False
+    def _get_setup_status(self) -> Optional[StatusBase]:
+        """Return the status describing an invalid config, missing relation or container.
 
-        if self._missing_relations():
-            return False
+        Returns:
+            Optional[StatusBase]: Blocked or Waiting status, or None if all conditions are met
+        """
+        if invalid_configs := self._get_invalid_configs():
+            return BlockedStatus(f"The following configurations are not valid: {invalid_configs}")
+
+        if missing_relations := ", ".join(self._missing_relations()):
+            return BlockedStatus(f"Waiting for {missing_relations} relation(s)")
+
+        if not self._can_connect_to_container():
+            return WaitingStatus("Waiting for container to be ready")
 
+        return None
+
+    @cached_property
+    def _data_status(self) -> Optional[StatusBase]:
+        """Return the status describing the first unavailable piece of configuration data.
+
+        The NRF and Webui URLs, the storage and the pod IP are checked once per charm
+        instance, so the configuration handler and the status collection share the same
+        checks. It must only be used once the container is reachable.
+
+        Returns:
+            Optional[StatusBase]: Waiting status, or None if all the data is available
+        """
         if not self._nrf_is_available():
-            return False
+            return WaitingStatus("Waiting for NRF relation to be available")
 
-        if not self._webui_data_is_available:
-            return False
+        if not self._webui_data_is_available():
+            return WaitingStatus("Waiting for Webui data to be available")
 
         if not self._storage_is_attached():
-            return False
+            return WaitingStatus("Waiting for storage to be attached")
 
-        if not _get_pod_ip():
-            return False
+        if not self._pod_ip:
+            return WaitingStatus("Waiting for pod IP address to be available")
 
-        return True
+        return None
 
-    def _check_and_update_certificate(self) -> bool:
+    def _check_and_update_certificate(
+        self, certificate: Certificate, private_key: PrivateKey
+    ) -> bool:
         """Check if the certificate or private key needs an update and perform the update.
 
-        This method retrieves the currently assigned certificate and private key associated with
-        the charm's TLS relation. It checks whether the certificate or private key has changed
-        or needs to be updated. If an update is necessary, the new certificate or private key is
-        stored.
+        This method checks whether the certificate or private key assigned through the
+        charm's TLS relation has changed or needs to be updated. If an update is necessary,
+        the new certificate or private key is stored.
+
+        Args:
+            certificate (Certificate): Certificate assigned to the charm.
+            private_key (PrivateKey): Private key used for the certificate request.
 
         Returns:
             bool: True if either the certificate or the private key was updated, False otherwise.
         """
-        provider_certificate, private_key = self._certificates.get_assigned_certificate(
-            certificate_request=self._get_certificate_request()
-        )
-        if not provider_certificate or not private_key:
-            logger.debug("Certificate or private key is not available")
-            return False
-        if certificate_update_required := self._is_certificate_update_required(
-            provider_certificate.certificate
-        ):
-            self._store_certificate(certificate=provider_certificate.certificate)
+        if certificate_update_required := self._is_certificate_update_required(certificate):
+            self._store_certificate(certificate=certificate)
         if private_key_update_required := self._is_private_key_update_required(private_key):
             self._store_private_key(private_key=private_key)
         return certificate_update_required or private_key_update_required
 
-    @staticmethod
-    def _get_certificate_request() -> CertificateRequestAttributes:
-        return CertificateRequestAttributes(
-            common_name=CERTIFICATE_COMMON_NAME,
-            sans_dns=frozenset([CERTIFICATE_COMMON_NAME]),
-        )
-
     def _missing_relations(self) -> List[str]:
         """Return list of missing relations.
 
@@ -295,19 +327,16 @@ class SMFOperatorCharm(CharmBase):
         Returns:
             list: missing relation names.
         """
-        missing_relations = []
-        for relation in [
-            FIVEG_NRF_RELATION_NAME,
-            TLS_RELATION_NAME,
-            SDCORE_CONFIG_RELATION_NAME,
-        ]:
-            if not self._relation_created(relation):
-                missing_relations.append(relation)
-        return missing_relations
+        relations = self.model.relations
+        return [relation for relation in REQUIRED_RELATIONS if not relations[relation]]
 
-    @property
     def _webui_data_is_available(self) -> bool:
-        return bool(self._webui_requires.webui_url)
+        """Return whether the Webui URL is available.
+
+        Returns:
+            bool: whether the Webui URL is available.
+        """
+        return bool(self._webui_url)
 
     def _push_config_file(
         self,
@@ -318,9 +347,13 @@ class SMFOperatorCharm(CharmBase):
         Args:
             content (str): Content of the config file.
         """
+        self._container.push(path=CONFIG_FILE_PATH, source=content, make_dirs=True)
         self._container.push(
-            path=f"{BASE_CONFIG_PATH}/{CONFIG_FILE}", source=content, make_dirs=True
+            path=CONFIG_FILE_DIGEST_PATH,
+            source=_get_content_digest(content),
+            make_dirs=True,
         )
+        self._forget_workload_directory(BASE_CONFIG_PATH)
         logger.info("Pushed: %s to workload.", CONFIG_FILE)
 
     def _is_config_update_required(self, content: str) -> bool:
@@ -344,32 +377,55 @@ class SMFOperatorCharm(CharmBase):
         Returns:
             content (str): desired config file content
         """
-        if not self._nrf_requires.nrf_url:
+        if not (nrf_url := self._nrf_url):
             return ""
-        if not (pod_ip := _get_pod_ip()):
+        if not (pod_ip := self._pod_ip):
             return ""
-        if not self._webui_requires.webui_url:
+        if not (webui_url := self._webui_url):
             return ""
         if not (log_level := self._get_log_level_config()):
             return ""
         return self._render_config_file(
             smf_url=self._smf_hostname,
             smf_sbi_port=SMF_SBI_PORT,
-            nrf_url=self._nrf_requires.nrf_url,
+            nrf_url=nrf_url,
             pod_ip=pod_ip,
             scheme="https",
-            tls_key_path=f"{CERTS_DIR_PATH}/{PRIVATE_KEY_NAME}",
-            tls_certificate_path=f"{CERTS_DIR_PATH}/{CERTIFICATE_NAME}",
-            webui_uri=self._webui_requires.webui_url,
+            tls_key_path=PRIVATE_KEY_PATH,
+            tls_certificate_path=CERTIFICATE_PATH,
+            webui_uri=webui_url,
             log_level=log_level,
         )
 
     def _is_certificate_update_required(self, certificate: Certificate) -> bool:
+        if stored_digest := self._get_stored_digest(CERTIFICATE_NAME, CERTIFICATE_DIGEST_NAME):
+            return stored_digest != _get_content_digest(str(certificate))
         return self._get_existing_certificate() != certificate
 
     def _is_private_key_update_required(self, private_key: PrivateKey) -> bool:
+        if stored_digest := self._get_stored_digest(PRIVATE_KEY_NAME, PRIVATE_KEY_DIGEST_NAME):
+            return stored_digest != _get_content_digest(str(private_key))
         return self._get_existing_private_key() != private_key
 
+    def _get_stored_digest(self, file_name: str, digest_name: str) -> Optional[str]:
+        """Return the digest stored alongside a file in the certs directory.
+
+        The digest describes the content the charm last pushed, so an edit made to the
+        file inside the workload is not detected while the digest is present.
+
+        Args:
+            file_name (str): Name of the stored file.
+            digest_name (str): Name of the file holding its digest.
+
+        Returns:
+            Optional[str]: The stored digest, or None if the file or its digest is missing.
+        """
+        if not self._workload_file_exists(CERTS_DIR_PATH, file_name):
+            return None
+        if not self._workload_file_exists(CERTS_DIR_PATH, digest_name):
+            return None
+        return self._read_workload_file(CERTS_DIR_PATH, digest_name)
+
     def _get_existing_certificate(self) -> Optional[Certificate]:
         return self._get_stored_certificate() if self._certificate_is_stored() else None
 
@@ -378,59 +434,73 @@ class SMFOperatorCharm(CharmBase):
 
     def _on_certificates_relation_broken(self, event: EventBase) -> None:
         """Delete TLS related artifacts and reconfigures workload."""
-        if not self._container.can_connect():
+        if not self._can_connect_to_container():
             event.defer()
             return
-        self._delete_private_key()
-        self._delete_certificate()
+        self._delete_tls_files()
 
     def _certificate_is_available(self) -> bool:
         cert, key = self._certificates.get_assigned_certificate(
-            certificate_request=self._get_certificate_request()
+            certificate_request=CERTIFICATE_REQUEST
         )
         return bool(cert and key)
 
-    def _delete_private_key(self) -> None:
-        """Remove private key from workload."""
-        if not self._private_key_is_stored():
-            return
-        self._container.remove_path(path=f"{CERTS_DIR_PATH}/{PRIVATE_KEY_NAME}")
-        logger.info("Removed private key from workload")
+    def _delete_tls_files(self) -> None:
+        """Remove the private key, the certificate and their digests from workload.
 
-    def _delete_certificate(self) -> None:
-        """Delete certificate from workload."""
-        if not self._certificate_is_stored():
-            return
-        self._container.remove_path(path=f"{CERTS_DIR_PATH}/{CERTIFICATE_NAME}")
-        logger.info("Removed certificate from workload")
+        Each file is checked against a single listing of the certs directory, which is
+        forgotten once all of them are removed.
+        """
+        for path, file_name in (
+            (PRIVATE_KEY_PATH, PRIVATE_KEY_NAME),
+            (PRIVATE_KEY_DIGEST_PATH, PRIVATE_KEY_DIGEST_NAME),
+            (CERTIFICATE_PATH, CERTIFICATE_NAME),
+            (CERTIFICATE_DIGEST_PATH, CERTIFICATE_DIGEST_NAME),
+        ):
+            if self._workload_file_exists(CERTS_DIR_PATH, file_name):
+                self._container.remove_path(path=path)
+                logger.info("Removed %s from workload", file_name)
+        self._forget_workload_directory(CERTS_DIR_PATH)
 
     def _private_key_is_stored(self) -> bool:
         """Return whether private key is stored in workload."""
-        return self._container.exists(path=f"{CERTS_DIR_PATH}/{PRIVATE_KEY_NAME}")
+        return self._workload_file_exists(CERTS_DIR_PATH, PRIVATE_KEY_NAME)
 
     def _get_stored_certificate(self) -> Certificate:
-        cert_string = str(self._container.pull(path=f"{CERTS_DIR_PATH}/{CERTIFICATE_NAME}").read())
+        cert_string = self._read_workload_file(CERTS_DIR_PATH, CERTIFICATE_NAME)
         return Certificate.from_string(cert_string)
 
     def _get_stored_private_key(self) -> PrivateKey:
-        key_string = str(self._container.pull(path=f"{CERTS_DIR_PATH}/{PRIVATE_KEY_NAME}").read())
+        key_string = self._read_workload_file(CERTS_DIR_PATH, PRIVATE_KEY_NAME)
         return PrivateKey.from_string(key_string)
 
     def _certificate_is_stored(self) -> bool:
         """Return whether certificate is stored in workload."""
-        return self._container.exists(path=f"{CERTS_DIR_PATH}/{CERTIFICATE_NAME}")
+        return self._workload_file_exists(CERTS_DIR_PATH, CERTIFICATE_NAME)
 
     def _store_certificate(self, certificate: Certificate) -> None:
         """Store certificate in workload."""
-        self._container.push(path=f"{CERTS_DIR_PATH}/{CERTIFICATE_NAME}", source=str(certificate))
+        certificate_string = str(certificate)
+        self._container.push(path=CERTIFICATE_PATH, source=certificate_string)
+        self._container.push(
+            path=CERTIFICATE_DIGEST_PATH,
+            source=_get_content_digest(certificate_string),
+        )
+        self._forget_workload_directory(CERTS_DIR_PATH)
         logger.info("Pushed certificate to workload")
 
     def _store_private_key(self, private_key: PrivateKey) -> None:
         """Store private key in workload."""
+        private_key_string = str(private_key)
         self._container.push(
-            path=f"{CERTS_DIR_PATH}/{PRIVATE_KEY_NAME}",
-            source=str(private_key),
+            path=PRIVATE_KEY_PATH,
+            source=private_key_string,
         )
+        self._container.push(
+            path=PRIVATE_KEY_DIGEST_PATH,
+            source=_get_content_digest(private_key_string),
+        )
+        self._forget_workload_directory(CERTS_DIR_PATH)
         logger.info("Pushed private key to workload")
 
     def _get_workload_version(self) -> str:
@@ -483,7 +553,7 @@ class SMFOperatorCharm(CharmBase):
         if plan.services != self._pebble_layer.services:
             self._container.add_layer(self._container_name, self._pebble_layer, combine=True)
             self._container.replan()
-            logger.info("New layer added: %s", self._pebble_layer)
+            logger.info("New layer added for service %s", self._service_name)
         if restart:
             self._container.restart(self._service_name)
             logger.info("Restarted container %s", self._service_name)
@@ -491,37 +561,104 @@ class SMFOperatorCharm(CharmBase):
 
     def _write_ue_config_file(self) -> None:
         """Write UE config file to workload."""
-        with open(f"src/{UEROUTING_CONFIG_FILE}", "r") as f:
-            content = f.read()
-
         self._container.push(
-            path=f"{BASE_CONFIG_PATH}/{UEROUTING_CONFIG_FILE}", source=content, make_dirs=True
+            path=UEROUTING_CONFIG_FILE_PATH,
+            source=_UEROUTING_CONFIG_CONTENT,
+            make_dirs=True,
         )
+        self._forget_workload_directory(BASE_CONFIG_PATH)
         logger.info("Pushed %s config file to workload", UEROUTING_CONFIG_FILE)
 
-    def _relation_created(self, relation_name: str) -> bool:
-        """Return whether a given Juju relation was created.
+    def _can_connect_to_container(self) -> bool:
+        """Return whether Pebble is reachable in the workload container.
 
-        Args:
-            relation_name (str): Relation name
+        A successful probe is remembered for the rest of the charm instance, while a
+        failed one is retried on the next call.
 
         Returns:
-            bool: Whether the relation was created.
+            bool: Whether the container is reachable.
         """
-        return bool(self.model.get_relation(relation_name))
+        if not self._container_is_reachable:
+            self._container_is_reachable = self._container.can_connect()
+        return self._container_is_reachable
 
     def _storage_is_attached(self) -> bool:
-        return self._container.exists(path=BASE_CONFIG_PATH) and self._container.exists(
-            path=CERTS_DIR_PATH
+        return (
+            self._list_workload_directory(BASE_CONFIG_PATH) is not None
+            and self._list_workload_directory(CERTS_DIR_PATH) is not None
         )
 
+    def _list_workload_directory(self, path: str) -> Optional[Dict[str, FileInfo]]:
+        """Return the entries of a workload directory, keyed by file name.
+
+        The directory is listed with a single Pebble call, and the listing is reused
+        until a file is pushed to or removed from that directory.
+
+        Args:
+            path (str): Directory path in the workload container.
+
+        Returns:
+            dict: Directory entries keyed by file name, None if the directory does not exist.
+        """
+        if path not in self._workload_directories:
+            try:
+                files = self._container.list_files(path)
+            except APIError as e:
+                if e.code != 404:
+                    raise
+                self._workload_directories[path] = None
+            else:
+                self._workload_directories[path] = {file.name: file for file in files}
+        return self._workload_directories[path]
+
+    def _workload_file_exists(self, directory: str, file_name: str) -> bool:
+        """Return whether a file exists in a workload directory.
+
+        Args:
+            directory (str): Directory path in the workload container.
+            file_name (str): Name of the file.
+
+        Returns:
+            bool: Whether the file exists.
+        """
+        files = self._list_workload_directory(directory)
+        return files is not None and file_name in files
+
+    def _read_workload_file(self, directory: str, file_name: str) -> str:
+        """Return the content of a workload file.
+
+        The file is pulled once and its content is reused until a file is pushed to
+        or removed from its directory.
+
+        Args:
+            directory (str): Directory path in the workload container.
+            file_name (str): Name of the file.
+
+        Returns:
+            str: File content.
+        """
+        path = f"{directory}/{file_name}"
+        if path not in self._workload_file_contents:
+            self._workload_file_contents[path] = self._container.pull(path=path).read()
+        return self._workload_file_contents[path]
+
+    def _forget_workload_directory(self, path: str) -> None:
+        """Drop cached listing and file contents of a workload directory after it changed."""
+        self._workload_directories.pop(path, None)
+        for file_path in [
+            file_path
+            for file_path in self._workload_file_contents
+            if file_path.startswith(f"{path}/")
+        ]:
+            del self._workload_file_contents[file_path]
+
     def _config_file_is_written(self) -> bool:
         """Return whether the config file was written to the workload container.
 
         Returns:
             bool: Whether the config file was written.
         """
-        return bool(self._container.exists(f"{BASE_CONFIG_PATH}/{CONFIG_FILE}"))
+        return self._workload_file_exists(BASE_CONFIG_PATH, CONFIG_FILE)
 
     @staticmethod
     def _render_config_file(
@@ -552,9 +689,7 @@ class SMFOperatorCharm(CharmBase):
         Returns:
             str: Config file content.
         """
-        jinja2_env = Environment(loader=FileSystemLoader("src/templates"))
-        template = jinja2_env.get_template("smfcfg.yaml.j2")
-        return template.render(
+        return _SMF_CONFIG_TEMPLATE.render(
             smf_url=smf_url,
             smf_sbi_port=smf_sbi_port,
             nrf_url=nrf_url,
@@ -569,11 +704,43 @@ class SMFOperatorCharm(CharmBase):
     def _config_file_content_matches(self, content: str) -> bool:
         """Return whether the config file content matches the provided content.
 
+        The size of the existing file is compared first, so a file that changed size
+        is not pulled from the workload container. When the digest written alongside
+        the config file is available, only the digest is pulled. Otherwise, the file
+        is streamed in chunks and the comparison stops at the first difference.
+
+        The digest describes the content the charm last pushed, so an edit made to the
+        file inside the workload that keeps its size is not detected.
+
         Returns:
             bool: Whether the config file content matches
         """
-        existing_content = self._container.pull(path=f"{BASE_CONFIG_PATH}/{CONFIG_FILE}")
-        return existing_content.read() == content
+        config_directory = self._list_workload_directory(BASE_CONFIG_PATH) or {}
+        existing_file = config_directory.get(CONFIG_FILE)
+        if existing_file is not None and existing_file.size != len(content.encode()):
+            return False
+        if CONFIG_FILE_DIGEST in config_directory:
+            existing_digest = self._read_workload_file(BASE_CONFIG_PATH, CONFIG_FILE_DIGEST)
+            return existing_digest == _get_content_digest(content)
+        return self._streamed_file_content_matches(CONFIG_FILE_PATH, content)
+
+    def _streamed_file_content_matches(self, path: str, content: str) -> bool:
+        """Return whether a workload file content matches the provided content.
+
+        Args:
+            path (str): File path in the workload container.
+            content (str): Expected content.
+
+        Returns:
+            bool: Whether the file content matches.
+        """
+        offset = 0
+        with self._container.pull(path=path) as existing_file:
+            while chunk := existing_file.read(FILE_READ_CHUNK_SIZE):
+                if content[offset : offset + len(chunk)] != chunk:
+                    return False
+                offset += len(chunk)
+        return offset == len(content)
 
     def _ue_config_file_is_written(self) -> bool:
         """Return whether the config file was written to the workload container.
@@ -581,7 +748,7 @@ class SMFOperatorCharm(CharmBase):
         Returns:
             bool: Whether the config file was written.
         """
-        return bool(self._container.exists(f"{BASE_CONFIG_PATH}/{UEROUTING_CONFIG_FILE}"))
+        return self._workload_file_exists(BASE_CONFIG_PATH, UEROUTING_CONFIG_FILE)
 
     def _nrf_is_available(self) -> bool:
         """Return whether the NRF endpoint is available.
@@ -589,11 +756,29 @@ class SMFOperatorCharm(CharmBase):
         Returns:
             bool: whether the NRF endpoint is available.
         """
-        return bool(self._nrf_requires.nrf_url)
+        return bool(self._nrf_url)
 
-    @property
+    @cached_property
+    def _nrf_url(self) -> Optional[str]:
+        """Return the NRF URL, read from relation data once per charm instance.
+
+        Returns:
+            str: The NRF URL.
+        """
+        return self._nrf_requires.nrf_url
+
+    @cached_property
+    def _webui_url(self) -> Optional[str]:
+        """Return the Webui URL, read from relation data once per charm instance.
+
+        Returns:
+            str: The Webui URL.
+        """
+        return self._webui_requires.webui_url
+
+    @cached_property
     def _pebble_layer(self) -> Layer:
-        """Return a dictionary representing a Pebble layer.
+        """Return a dictionary representing a Pebble layer, built once per charm instance.
 
         Returns:
             dict: Pebble layer
@@ -604,8 +789,7 @@ class SMFOperatorCharm(CharmBase):
                     self._service_name: {
                         "override": "replace",
                         "startup": "enabled",
-                        "command": f"/bin/smf -smfcfg {BASE_CONFIG_PATH}/{CONFIG_FILE} "
-                        f"-uerouting {BASE_CONFIG_PATH}/{UEROUTING_CONFIG_FILE}",
+                        "command": SMF_COMMAND,
                         "environment": self._environment_variables,
                     }
                 },
@@ -619,11 +803,16 @@ class SMFOperatorCharm(CharmBase):
         Returns:
             dict: environment variables
         """
-        return {
-            "PFCP_PORT_UPF": "8805",
-            "MANAGED_BY_CONFIG_POD": "true",
-            "POD_IP": _get_pod_ip(),
-        }
+        return {**STATIC_ENVIRONMENT_VARIABLES, "POD_IP": self._pod_ip}
+
+    @cached_property
+    def _pod_ip(self) -> Optional[str]:
+        """Return the pod IP, fetched once per charm instance.
+
+        Returns:
+            str: The pod IP.
+        """
+        return _get_pod_ip()
 
     @property
     def _smf_hostname(self) -> str:
@@ -642,7 +831,24 @@ def _get_pod_ip() -> Optional[str]:
         str: The pod IP.
     """
     ip_address = check_output(["unit-get", "private-address"])
-    return str(IPv4Address(ip_address.decode().strip())) if ip_address else None
+    if not ip_address:
+        return None
+    ip_address_string = ip_address.decode().strip()
+    if _IPV4_ADDRESS_PATTERN.match(ip_address_string):
+        return ip_address_string
+    return str(IPv4Address(ip_address_string))
+
+
+def _get_content_digest(content: str) -> str:
+    """Return the SHA-256 digest of a workload file content.
+
+    Args:
+        content (str): File content.
+
+    Returns:
+        str: Hexadecimal digest.
+    """
+    return hashlib.sha256(content.encode()).hexdigest()
 
 
 if __name__ == "__main__":  # pragma: nocover
@@ -38,6 +38,12 @@ class TestCharmCertificatesRelationBroken(SMFUnitTestFixtures):
             with open(f"{tempdir}/smf.key", "w") as f:
                 f.write("private key")
 
+            with open(f"{tempdir}/smf.pem.sha256", "w") as f:
+                f.write("certificate digest")
+
+            with open(f"{tempdir}/smf.key.sha256", "w") as f:
+                f.write("private key digest")
+
             state_in = testing.State(
                 relations=[certificates_relation],
                 containers=[container],
@@ -48,3 +54,5 @@ class TestCharmCertificatesRelationBroken(SMFUnitTestFixtures):
 
             assert not os.path.exists(f"{tempdir}/smf.pem")
             assert not os.path.exists(f"{tempdir}/smf.key")
+            assert not os.path.exists(f"{tempdir}/smf.pem.sha256")
+            assert not os.path.exists(f"{tempdir}/smf.key.sha256")
@@ -422,3 +422,25 @@ class TestCharmCollectUnitStatus(SMFUnitTestFixtures):
             state_out = self.ctx.run(self.ctx.on.collect_unit_status(), state_in)
 
             assert state_out.workload_version == expected_version
+
+    def test_given_workload_version_file_and_relations_not_created_when_collect_unit_status_then_workload_version_not_set(  # noqa: E501
+        self,
+    ):
+        with tempfile.TemporaryDirectory() as tempdir:
+            workload_version_mount = testing.Mount(
+                location="/etc",
+                source=tempdir,
+            )
+            with open(f"{tempdir}/workload-version", "w") as f:
+                f.write("1.2.3")
+            container = testing.Container(
+                name="smf", can_connect=True, mounts={"workload-version": workload_version_mount}
+            )
+            state_in = testing.State(
+                leader=True,
+                containers=[container],
+            )
+
+            state_out = self.ctx.run(self.ctx.on.collect_unit_status(), state_in)
+
+            assert state_out.workload_version == ""
@@ -1,6 +1,7 @@
 # Copyright 2024 Canonical Ltd.
 # See LICENSE file for licensing details.
 
+import hashlib
 import os
 import tempfile
 
@@ -225,3 +226,289 @@ class TestCharmConfigure(SMFUnitTestFixtures):
 
             assert os.stat(tempdir + "/smf.pem").st_mtime == config_modification_time_smf_pem
             assert os.stat(tempdir + "/smf.key").st_mtime == config_modification_time_smf_key
+
+    def test_given_certificate_and_private_key_digests_match_stored_ones_when_pebble_ready_then_they_are_not_pushed(  # noqa: E501
+        self,
+    ):
+        with tempfile.TemporaryDirectory() as tempdir:
+            nrf_relation = testing.Relation(endpoint="fiveg_nrf", interface="fiveg_nrf")
+            certificates_relation = testing.Relation(
+                endpoint="certificates", interface="tls-certificates"
+            )
+            sdcore_config_relation = testing.Relation(
+                endpoint="sdcore_config", interface="sdcore_config"
+            )
+            container = testing.Container(
+                name="smf",
+                can_connect=True,
+                mounts={
+                    "certs": testing.Mount(location="/support/TLS", source=tempdir),
+                    "config": testing.Mount(location="/etc/smf", source=tempdir),
+                },
+            )
+            state_in = testing.State(
+                leader=True,
+                relations=[
+                    nrf_relation,
+                    certificates_relation,
+                    sdcore_config_relation,
+                ],
+                containers=[container],
+            )
+            self.mock_check_output.return_value = b"1.1.1.1"
+            self.mock_nrf_url.return_value = "https://nrf:443"
+            provider_certificate, private_key = example_cert_and_key(
+                relation_id=certificates_relation.id
+            )
+            self.mock_get_assigned_certificate.return_value = (provider_certificate, private_key)
+            certificate_string = str(provider_certificate.certificate)
+            with open(f"{tempdir}/smf.pem", "w") as f:
+                f.write(certificate_string)
+            with open(f"{tempdir}/smf.pem.sha256", "w") as f:
+                f.write(hashlib.sha256(certificate_string.encode()).hexdigest())
+            private_key_string = str(private_key)
+            with open(f"{tempdir}/smf.key", "w") as f:
+                f.write(private_key_string)
+            with open(f"{tempdir}/smf.key.sha256", "w") as f:
+                f.write(hashlib.sha256(private_key_string.encode()).hexdigest())
+            config_modification_time_smf_pem = os.stat(tempdir + "/smf.pem").st_mtime
+            config_modification_time_smf_key = os.stat(tempdir + "/smf.key").st_mtime
+
+            self.ctx.run(self.ctx.on.pebble_ready(container=container), state_in)
+
+            assert os.stat(tempdir + "/smf.pem").st_mtime == config_modification_time_smf_pem
+            assert os.stat(tempdir + "/smf.key").st_mtime == config_modification_time_smf_key
+
+    def test_given_relations_available_when_pebble_ready_then_pod_ip_is_fetched_once(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            nrf_relation = testing.Relation(endpoint="fiveg_nrf", interface="fiveg_nrf")
+            certificates_relation = testing.Relation(
+                endpoint="certificates", interface="tls-certificates"
+            )
+            sdcore_config_relation = testing.Relation(
+                endpoint="sdcore_config", interface="sdcore_config"
+            )
+            container = testing.Container(
+                name="smf",
+                can_connect=True,
+                mounts={
+                    "certs": testing.Mount(location="/support/TLS", source=tempdir),
+                    "config": testing.Mount(location="/etc/smf", source=tempdir),
+                },
+            )
+            state_in = testing.State(
+                leader=True,
+                relations=[
+                    nrf_relation,
+                    certificates_relation,
+                    sdcore_config_relation,
+                ],
+                containers=[container],
+            )
+            self.mock_check_output.return_value = b"1.1.1.1"
+            self.mock_nrf_url.return_value = "https://nrf:443"
+            self.mock_sdcore_config_webui_url.return_value = "sdcore-webui:9876"
+            provider_certificate, private_key = example_cert_and_key(
+                relation_id=certificates_relation.id
+            )
+            self.mock_get_assigned_certificate.return_value = (provider_certificate, private_key)
+
+            self.ctx.run(self.ctx.on.pebble_ready(container=container), state_in)
+
+            self.mock_check_output.assert_called_once_with(["unit-get", "private-address"])
+
+    def test_given_relations_available_when_pebble_ready_then_config_file_digest_is_pushed(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            nrf_relation = testing.Relation(endpoint="fiveg_nrf", interface="fiveg_nrf")
+            certificates_relation = testing.Relation(
+                endpoint="certificates", interface="tls-certificates"
+            )
+            sdcore_config_relation = testing.Relation(
+                endpoint="sdcore_config", interface="sdcore_config"
+            )
+            container = testing.Container(
+                name="smf",
+                can_connect=True,
+                mounts={
+                    "certs": testing.Mount(location="/support/TLS", source=tempdir),
+                    "config": testing.Mount(location="/etc/smf", source=tempdir),
+                },
+            )
+            state_in = testing.State(
+                leader=True,
+                relations=[
+                    nrf_relation,
+                    certificates_relation,
+                    sdcore_config_relation,
+                ],
+                containers=[container],
+            )
+            self.mock_check_output.return_value = b"1.1.1.1"
+            self.mock_nrf_url.return_value = "https://nrf:443"
+            self.mock_sdcore_config_webui_url.return_value = "sdcore-webui:9876"
+            provider_certificate, private_key = example_cert_and_key(
+                relation_id=certificates_relation.id
+            )
+            self.mock_get_assigned_certificate.return_value = (provider_certificate, private_key)
+
+            self.ctx.run(self.ctx.on.pebble_ready(container=container), state_in)
+
+            with open(tempdir + "/smfcfg.yaml", "rb") as f:
+                expected_digest = hashlib.sha256(f.read()).hexdigest()
+            with open(tempdir + "/smfcfg.yaml.sha256", "r") as f:
+                assert f.read() == expected_digest
+
+    def test_given_config_file_digest_matches_when_pebble_ready_then_config_file_is_not_pushed(
+        self,
+    ):
+        with tempfile.TemporaryDirectory() as tempdir:
+            nrf_relation = testing.Relation(endpoint="fiveg_nrf", interface="fiveg_nrf")
+            certificates_relation = testing.Relation(
+                endpoint="certificates", interface="tls-certificates"
+            )
+            sdcore_config_relation = testing.Relation(
+                endpoint="sdcore_config", interface="sdcore_config"
+            )
+            container = testing.Container(
+                name="smf",
+                can_connect=True,
+                mounts={
+                    "certs": testing.Mount(location="/support/TLS", source=tempdir),
+                    "config": testing.Mount(location="/etc/smf", source=tempdir),
+                },
+            )
+            state_in = testing.State(
+                leader=True,
+                relations=[
+                    nrf_relation,
+                    certificates_relation,
+                    sdcore_config_relation,
+                ],
+                containers=[container],
+                model=testing.Model(name="whatever"),
+            )
+            self.mock_check_output.return_value = b"1.1.1.1"
+            self.mock_nrf_url.return_value = "https://nrf:443"
+            self.mock_sdcore_config_webui_url.return_value = "sdcore-webui:9876"
+            provider_certificate, private_key = example_cert_and_key(
+                relation_id=certificates_relation.id
+            )
+            self.mock_get_assigned_certificate.return_value = (provider_certificate, private_key)
+            with open("tests/unit/expected_smfcfg.yaml", "r") as f:
+                expected_config = f.read()
+            with open(tempdir + "/smfcfg.yaml", "w") as f:
+                f.write(expected_config)
+            with open(tempdir + "/smfcfg.yaml.sha256", "w") as f:
+                f.write(hashlib.sha256(expected_config.encode()).hexdigest())
+            config_modification_time = os.stat(tempdir + "/smfcfg.yaml").st_mtime
+            digest_modification_time = os.stat(tempdir + "/smfcfg.yaml.sha256").st_mtime
+
+            self.ctx.run(self.ctx.on.pebble_ready(container=container), state_in)
+
+            assert os.stat(tempdir + "/smfcfg.yaml").st_mtime == config_modification_time
+            assert os.stat(tempdir + "/smfcfg.yaml.sha256").st_mtime == digest_modification_time
+
+    def test_given_stale_config_file_digest_when_pebble_ready_then_config_file_is_pushed(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            nrf_relation = testing.Relation(endpoint="fiveg_nrf", interface="fiveg_nrf")
+            certificates_relation = testing.Relation(
+                endpoint="certificates", interface="tls-certificates"
+            )
+            sdcore_config_relation = testing.Relation(
+                endpoint="sdcore_config", interface="sdcore_config"
+            )
+            container = testing.Container(
+                name="smf",
+                can_connect=True,
+                mounts={
+                    "certs": testing.Mount(location="/support/TLS", source=tempdir),
+                    "config": testing.Mount(location="/etc/smf", source=tempdir),
+                },
+            )
+            state_in = testing.State(
+                leader=True,
+                relations=[
+                    nrf_relation,
+                    certificates_relation,
+                    sdcore_config_relation,
+                ],
+                containers=[container],
+                model=testing.Model(name="whatever"),
+            )
+            self.mock_check_output.return_value = b"1.1.1.1"
+            self.mock_nrf_url.return_value = "https://nrf:443"
+            self.mock_sdcore_config_webui_url.return_value = "sdcore-webui:9876"
+            provider_certificate, private_key = example_cert_and_key(
+                relation_id=certificates_relation.id
+            )
+            self.mock_get_assigned_certificate.return_value = (provider_certificate, private_key)
+            with open("tests/unit/expected_smfcfg.yaml", "r") as f:
+                expected_config = f.read()
+            with open(tempdir + "/smfcfg.yaml", "w") as f:
+                f.write(expected_config)
+            with open(tempdir + "/smfcfg.yaml.sha256", "w") as f:
+                f.write(hashlib.sha256(b"stale config").hexdigest())
+
+            self.ctx.run(self.ctx.on.pebble_ready(container=container), state_in)
+
+            with open(tempdir + "/smfcfg.yaml.sha256", "r") as f:
+                assert f.read() == hashlib.sha256(expected_config.encode()).hexdigest()
+
+    def test_given_config_file_matches_and_no_digest_stored_when_pebble_ready_then_nothing_is_pushed(  # noqa: E501
+        self,
+    ):
+        with tempfile.TemporaryDirectory() as tempdir:
+            nrf_relation = testing.Relation(endpoint="fiveg_nrf", interface="fiveg_nrf")
+            certificates_relation = testing.Relation(
+                endpoint="certificates", interface="tls-certificates"
+            )
+            sdcore_config_relation = testing.Relation(
+                endpoint="sdcore_config", interface="sdcore_config"
+            )
+            container = testing.Container(
+                name="smf",
+                can_connect=True,
+                mounts={
+                    "certs": testing.Mount(location="/support/TLS", source=tempdir),
+                    "config": testing.Mount(location="/etc/smf", source=tempdir),
+                },
+            )
+            state_in = testing.State(
+                leader=True,
+                relations=[
+                    nrf_relation,
+                    certificates_relation,
+                    sdcore_config_relation,
+                ],
+                containers=[container],
+                model=testing.Model(name="whatever"),
+            )
+            self.mock_check_output.return_value = b"1.1.1.1"
+            self.mock_nrf_url.return_value = "https://nrf:443"
+            self.mock_sdcore_config_webui_url.return_value = "sdcore-webui:9876"
+            provider_certificate, private_key = example_cert_and_key(
+                relation_id=certificates_relation.id
+            )
+            self.mock_get_assigned_certificate.return_value = (provider_certificate, private_key)
+            with open("tests/unit/expected_smfcfg.yaml", "r") as f:
+                expected_config = f.read()
+            with open(tempdir + "/smfcfg.yaml", "w") as f:
+                f.write(expected_config)
+            certificate_string = str(provider_certificate.certificate)
+            with open(f"{tempdir}/smf.pem", "w") as f:
+                f.write(certificate_string)
+            private_key_string = str(private_key)
+            with open(f"{tempdir}/smf.key", "w") as f:
+                f.write(private_key_string)
+            config_modification_time = os.stat(tempdir + "/smfcfg.yaml").st_mtime
+            config_modification_time_smf_pem = os.stat(tempdir + "/smf.pem").st_mtime
+            config_modification_time_smf_key = os.stat(tempdir + "/smf.key").st_mtime
+
+            self.ctx.run(self.ctx.on.pebble_ready(container=container), state_in)
+
+            assert os.stat(tempdir + "/smfcfg.yaml").st_mtime == config_modification_time
+            assert os.stat(tempdir + "/smf.pem").st_mtime == config_modification_time_smf_pem
+            assert os.stat(tempdir + "/smf.key").st_mtime == config_modification_time_smf_key
+            assert not os.path.exists(tempdir + "/smfcfg.yaml.sha256")
+            assert not os.path.exists(tempdir + "/smf.pem.sha256")
+            assert not os.path.exists(tempdir + "/smf.key.sha256")